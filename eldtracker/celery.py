@@ -0,0 +1,16 @@
+"""
+Celery config for eldtracker project.
+
+Start a worker with ``celery -A eldtracker worker``. Tasks are discovered in
+each installed app's ``tasks.py``.
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'eldtracker.settings')
+
+app = Celery('eldtracker')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -54,6 +54,21 @@ CORS_ALLOW_METHODS = [
 ]
 
 
+# Django REST framework
+# orjson handles (de)serialization; the browsable API stays available.
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'trips.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'trips.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -69,6 +84,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so responses are compressed after every other middleware has run
+    'django.middleware.gzip.GZipMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -110,6 +127,41 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Uses Redis when REDIS_URL is set (shared across workers), otherwise a
+# per-process in-memory cache.
+
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+
+# Celery
+# Route planning runs as a background task. The broker is opt-in: set
+# CELERY_BROKER_URL only when a worker is deployed, otherwise tasks run inline.
+
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', '')
+CELERY_TASK_ALWAYS_EAGER = not CELERY_BROKER_URL
+CELERY_TASK_IGNORE_RESULT = True
+
+
+# Store daily log entries as a run-length encoded timeline on DailyLog
+# instead of one LogEntry row each.
+LOG_TIMELINE_RLE = os.getenv('LOG_TIMELINE_RLE', 'True') == 'True'
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
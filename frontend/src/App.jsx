@@ -4,6 +4,31 @@ import TripForm from './components/TripForm'
 import RouteMap from './components/RouteMap'
 import LogDisplay from './components/LogDisplay'
 
+const API_BASE_URL = 'https://driver-logs.onrender.com/api'
+const POLL_INTERVAL_MS = 1500
+const MAX_POLL_ATTEMPTS = 80
+
+// Poll a trip until its background route planning finishes
+async function waitForTrip(tripId) {
+  for (let attempt = 0; attempt < MAX_POLL_ATTEMPTS; attempt++) {
+    const response = await fetch(`${API_BASE_URL}/trips/${tripId}/`)
+    if (!response.ok) {
+      throw new Error('Failed to load trip')
+    }
+
+    const trip = await response.json()
+    if (trip.status === 'COMPLETE') {
+      return trip
+    }
+    if (trip.status === 'FAILED') {
+      throw new Error(trip.status_detail || 'Failed to calculate route')
+    }
+
+    await new Promise(resolve => setTimeout(resolve, POLL_INTERVAL_MS))
+  }
+  throw new Error('Route calculation timed out')
+}
+
 function App() {
   const [tripData, setTripData] = useState(null)
   const [loading, setLoading] = useState(false)
@@ -13,7 +38,7 @@ function App() {
     setLoading(true)
     setError(null)
     try {
-      const response = await fetch('https://driver-logs.onrender.com/api/trips/calculate_route/', {
+      const response = await fetch(`${API_BASE_URL}/trips/calculate_route/`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -26,7 +51,8 @@ function App() {
         throw new Error(errorData.error || 'Failed to calculate route')
       }
       
-      const data = await response.json()
+      const { trip_id } = await response.json()
+      const data = await waitForTrip(trip_id)
       setTripData(data)
     } catch (err) {
       setError(err.message)
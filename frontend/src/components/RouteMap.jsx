@@ -1,6 +1,35 @@
 import { useEffect, useRef } from 'react'
 import './RouteMap.css'
 
+// Decode a Google/ORS encoded polyline into [lat, lng] pairs
+function decodePolyline(encoded, precision = 5) {
+  const factor = Math.pow(10, precision)
+  const points = []
+  let index = 0
+  let lat = 0
+  let lng = 0
+
+  while (index < encoded.length) {
+    const deltas = []
+    for (let d = 0; d < 2; d++) {
+      let result = 0
+      let shift = 0
+      let byte
+      do {
+        byte = encoded.charCodeAt(index++) - 63
+        result |= (byte & 0x1f) << shift
+        shift += 5
+      } while (byte >= 0x20 && index < encoded.length)
+      deltas.push(result & 1 ? ~(result >> 1) : result >> 1)
+    }
+    lat += deltas[0]
+    lng += deltas[1]
+    points.push([lat / factor, lng / factor])
+  }
+
+  return points
+}
+
 function RouteMap({ trip, loading }) {
   const mapRef = useRef(null)
   const mapInstanceRef = useRef(null)
@@ -85,8 +114,13 @@ function RouteMap({ trip, loading }) {
         }
       })
 
-      // Draw polyline if available
-      if (waypoints.length >= 2) {
+      // Draw the route polyline, falling back to straight lines between waypoints
+      const routePath = typeof trip.route.polyline === 'string' && trip.route.polyline
+        ? decodePolyline(trip.route.polyline)
+        : []
+      if (routePath.length >= 2) {
+        window.L.polyline(routePath, { color: 'blue', weight: 3, opacity: 0.7 }).addTo(map)
+      } else if (waypoints.length >= 2) {
         const latLngs = waypoints.map(wp => [wp.lat, wp.lng])
         window.L.polyline(latLngs, { color: 'blue', weight: 3, opacity: 0.7 }).addTo(map)
       }
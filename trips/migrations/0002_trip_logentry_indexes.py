@@ -0,0 +1,21 @@
+# Generated by Django 4.2.8 on 2026-10-14 05:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trips', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='logentry',
+            index=models.Index(fields=['daily_log', 'hour', 'minute'], name='trips_logen_daily_l_dd7731_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trip',
+            index=models.Index(fields=['-created_at'], name='trips_trip_created_44654c_idx'),
+        ),
+    ]
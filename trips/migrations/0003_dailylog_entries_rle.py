@@ -0,0 +1,18 @@
+# Generated by Django 4.2.8 on 2026-10-14 05:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trips', '0002_trip_logentry_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailylog',
+            name='entries_rle',
+            field=models.JSONField(blank=True, default=list, help_text='Run-length encoded duty status timeline'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.8 on 2026-10-14 05:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trips', '0003_dailylog_entries_rle'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='route',
+            name='stops_bin',
+            field=models.BinaryField(help_text='orjson-encoded stops, written once at creation', null=True),
+        ),
+    ]
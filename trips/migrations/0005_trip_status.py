@@ -0,0 +1,23 @@
+# Generated by Django 4.2.8 on 2026-10-14 05:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trips', '0004_route_stops_bin'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trip',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('COMPLETE', 'Complete'), ('FAILED', 'Failed')], default='COMPLETE', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='trip',
+            name='status_detail',
+            field=models.TextField(blank=True, help_text='Why planning failed, if it did'),
+        ),
+    ]
@@ -1,9 +1,23 @@
+import orjson
 from django.db import models
 from django.utils import timezone
 from datetime import datetime, timedelta
 
+MINUTES_PER_DAY = 24 * 60
+
+
 class Trip(models.Model):
     """Represents a single trip with origin and destination"""
+    
+    STATUS_PENDING = 'PENDING'
+    STATUS_COMPLETE = 'COMPLETE'
+    STATUS_FAILED = 'FAILED'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_COMPLETE, 'Complete'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    
     current_location = models.CharField(max_length=255, help_text="Starting location (address or coordinates)")
     pickup_location = models.CharField(max_length=255, help_text="Pickup location")
     dropoff_location = models.CharField(max_length=255, help_text="Dropoff location")
@@ -13,12 +27,17 @@ class Trip(models.Model):
     total_distance = models.FloatField(default=0, help_text="Total distance in miles")
     estimated_duration = models.FloatField(default=0, help_text="Estimated duration in hours")
     
+    # Route planning runs in the background (see trips.tasks)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_COMPLETE)
+    status_detail = models.TextField(blank=True, help_text="Why planning failed, if it did")
+    
     # Trip details
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [models.Index(fields=['-created_at'])]
     
     def __str__(self):
         return f"Trip from {self.pickup_location} to {self.dropoff_location}"
@@ -50,6 +69,9 @@ class DailyLog(models.Model):
     # Remarks and locations
     remarks = models.TextField(blank=True, help_text="Trip details and location changes")
     
+    # Run-length encoded timeline: [[start_minute, duration, status, location, notes], ...]
+    entries_rle = models.JSONField(default=list, blank=True, help_text="Run-length encoded duty status timeline")
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -64,10 +86,56 @@ class DailyLog(models.Model):
         """Return total hours for the day (should be 24)"""
         return (self.off_duty_hours + self.sleeper_berth_hours + 
                 self.driving_hours + self.on_duty_hours)
+    
+    def set_timeline(self, events):
+        """
+        Store validated entry dicts (hour, minute, duty_status, location, notes) as runs
+        Each event lasts until the next one starts; consecutive events with the
+        same status, location and notes are merged into one run.
+        """
+        # Sort on the start minute only; events at the same minute keep input order
+        points = sorted(
+            (
+                (
+                    int(event.get('hour', 0)) * 60 + int(event.get('minute', 0)),
+                    event['duty_status'],
+                    str(event.get('location', '')),
+                    str(event.get('notes', '')),
+                )
+                for event in events
+            ),
+            key=lambda point: point[0]
+        )
+        
+        runs = []
+        for idx, (start, status, location, notes) in enumerate(points):
+            end = points[idx + 1][0] if idx + 1 < len(points) else MINUTES_PER_DAY
+            if end <= start:
+                continue
+            if runs and runs[-1][2:] == [status, location, notes]:
+                runs[-1][1] = end - runs[-1][0]
+            else:
+                runs.append([start, end - start, status, location, notes])
+        
+        self.entries_rle = runs
+    
+    def timeline_entries(self):
+        """Expand the run-length encoded timeline into LogEntry-shaped dicts"""
+        return [
+            {
+                "id": None,
+                "hour": start // 60,
+                "minute": start % 60,
+                "duty_status": status,
+                "location": location,
+                "notes": notes,
+            }
+            for start, _duration, status, location, notes in self.entries_rle
+        ]
 
 
 class LogEntry(models.Model):
-    """Individual hourly entries in a daily log"""
+    """Individual hourly entries in a daily log (legacy, see DailyLog.entries_rle)"""
     
     daily_log = models.ForeignKey(DailyLog, on_delete=models.CASCADE, related_name='entries')
     hour = models.IntegerField()  # 0-23 for 24-hour period
@@ -78,6 +146,7 @@ class LogEntry(models.Model):
     
     class Meta:
         ordering = ['hour', 'minute']
+        indexes = [models.Index(fields=['daily_log', 'hour', 'minute'])]
     
     def __str__(self):
         return f"{self.daily_log.log_date} {self.hour:02d}:{self.minute:02d} - {self.duty_status}"
@@ -92,10 +161,16 @@ class Route(models.Model):
     polyline = models.TextField(help_text="Encoded polyline for map display")
     waypoints = models.JSONField(default=list, help_text="Array of waypoint coordinates")
     
-    # Stops information
+    # Stops information. Rows written through set_stops keep their stops only in
+    # stops_bin (stops stays []); stops is read for legacy rows without bytes.
     stops = models.JSONField(default=list, help_text="Array of required stops (fuel, rest)")
+    stops_bin = models.BinaryField(null=True, editable=False, help_text="orjson-encoded stops, written once at creation")
     
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
         return f"Route for trip {self.trip.id}"
+    
+    def set_stops(self, stops):
+        """Store stops pre-encoded so reads can pass the bytes straight through"""
+        self.stops_bin = orjson.dumps(stops)
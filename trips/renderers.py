@@ -0,0 +1,31 @@
+"""
+orjson-based renderer for the trips API
+Serializes nested trip payloads in C instead of the stdlib json module
+"""
+import orjson
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+
+# Handles the types orjson doesn't know (Decimal, lazy strings, querysets...)
+_fallback_encoder = JSONEncoder()
+
+
+class ORJSONRenderer(BaseRenderer):
+    """Drop-in replacement for DRF's JSONRenderer"""
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        
+        options = ORJSON_OPTIONS
+        renderer_context = renderer_context or {}
+        if renderer_context.get('indent'):
+            # The browsable API asks for indented output
+            options |= orjson.OPT_INDENT_2
+        
+        return orjson.dumps(data, default=_fallback_encoder.default, option=options)
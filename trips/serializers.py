@@ -1,14 +1,38 @@
+import orjson
 from rest_framework import serializers
 from .models import Trip, DailyLog, LogEntry, Route
 
+
+class EncodedJSONField(serializers.Field):
+    """
+    Read-only field for a model's orjson-encoded bytes column
+    The bytes are wrapped in orjson.Fragment so ORJSONRenderer splices them
+    into the response without decoding; rows without bytes fall back to the
+    JSONField with the same name as this field.
+    """
+    def __init__(self, encoded_source, **kwargs):
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+        self.encoded_source = encoded_source
+    
+    def to_representation(self, instance):
+        encoded = getattr(instance, self.encoded_source)
+        if encoded:
+            return orjson.Fragment(bytes(encoded))
+        return getattr(instance, self.field_name)
+
 class LogEntrySerializer(serializers.ModelSerializer):
+    hour = serializers.IntegerField(min_value=0, max_value=23)
+    minute = serializers.IntegerField(min_value=0, max_value=59, default=0)
+    
     class Meta:
         model = LogEntry
         fields = ['id', 'hour', 'minute', 'duty_status', 'location', 'notes']
 
 
 class DailyLogSerializer(serializers.ModelSerializer):
-    entries = LogEntrySerializer(many=True, read_only=True)
+    entries = serializers.SerializerMethodField()
     
     class Meta:
         model = DailyLog
@@ -17,14 +41,31 @@ class DailyLogSerializer(serializers.ModelSerializer):
             'driving_hours', 'on_duty_hours', 'total_distance', 'total_vehicle_miles',
             'remarks', 'entries'
         ]
+    
+    def get_entries(self, obj):
+        if obj.entries_rle:
+            return obj.timeline_entries()
+        # Legacy per-row entries
+        return LogEntrySerializer(obj.entries.all(), many=True).data
 
 
 class RouteSerializer(serializers.ModelSerializer):
+    stops = EncodedJSONField(encoded_source='stops_bin')
+    
     class Meta:
         model = Route
         fields = ['id', 'polyline', 'waypoints', 'stops', 'created_at']
 
 
+class RouteSummarySerializer(serializers.ModelSerializer):
+    """Route without the polyline, for list views"""
+    stops = EncodedJSONField(encoded_source='stops_bin')
+    
+    class Meta:
+        model = Route
+        fields = ['id', 'waypoints', 'stops', 'created_at']
+
+
 class TripSerializer(serializers.ModelSerializer):
     daily_logs = DailyLogSerializer(many=True, read_only=True)
     route = RouteSerializer(read_only=True)
@@ -34,5 +75,10 @@ class TripSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'current_location', 'pickup_location', 'dropoff_location',
             'current_cycle_used', 'total_distance', 'estimated_duration',
-            'daily_logs', 'route', 'created_at', 'updated_at'
+            'status', 'status_detail', 'daily_logs', 'route', 'created_at', 'updated_at'
         ]
+        read_only_fields = ['status', 'status_detail']
+
+
+class TripListSerializer(TripSerializer):
+    route = RouteSummarySerializer(read_only=True)
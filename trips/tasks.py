@@ -0,0 +1,110 @@
+"""
+Background tasks for trip planning
+"""
+from datetime import date
+import os
+
+from celery import shared_task
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Trip, DailyLog, Route
+from .utils import generate_hos_schedule, geocode_addresses_batch, calculate_route
+
+
+class TripPlanningError(Exception):
+    """A trip couldn't be planned; the message is shown to the client"""
+
+
+@shared_task
+def calculate_route_task(trip_id):
+    """Geocode, route and schedule a pending trip, then mark it complete or failed"""
+    trip = Trip.objects.get(pk=trip_id)
+    
+    # Redelivered or duplicate tasks leave already planned trips alone
+    if trip.status != Trip.STATUS_PENDING:
+        return
+    
+    try:
+        plan_trip(trip)
+    except Exception as e:
+        Trip.objects.filter(pk=trip.pk, status=Trip.STATUS_PENDING).update(
+            status=Trip.STATUS_FAILED,
+            status_detail=str(e),
+            updated_at=timezone.now()
+        )
+
+
+def plan_trip(trip):
+    """Create the Route and DailyLogs for a trip from its three locations"""
+    maps_api_key = os.getenv('OPENROUTE_API_KEY')
+    if not maps_api_key:
+        raise TripPlanningError("Maps API key not configured")
+    
+    # Geocode locations in one batch
+    current_coords, pickup_coords, dropoff_coords = geocode_addresses_batch(
+        [trip.current_location, trip.pickup_location, trip.dropoff_location],
+        maps_api_key
+    )
+    
+    if not all([current_coords, pickup_coords, dropoff_coords]):
+        raise TripPlanningError("Could not geocode one or more addresses")
+    
+    # Calculate route: current -> pickup -> dropoff
+    route_data = calculate_route(
+        current_coords,
+        dropoff_coords,
+        via_pickup=pickup_coords,
+        maps_api_key=maps_api_key
+    )
+    
+    if not route_data:
+        raise TripPlanningError("Could not calculate route")
+    
+    # Generate HOS schedule
+    hos_schedule = generate_hos_schedule(
+        route_data['distance'],
+        trip.current_cycle_used,
+        has_pickup=True
+    )
+    
+    with transaction.atomic():
+        # Lock the row so only one worker writes the route and logs
+        locked = Trip.objects.select_for_update().only('status').get(pk=trip.pk)
+        if locked.status != Trip.STATUS_PENDING:
+            return
+        
+        # Update Trip
+        trip.total_distance = route_data['distance']
+        trip.estimated_duration = route_data['duration']
+        trip.status = Trip.STATUS_COMPLETE
+        trip.status_detail = ''
+        # Only the planned fields; the instance predates the ORS calls, so a full
+        # save would overwrite edits made to the trip in the meantime
+        trip.save(update_fields=['total_distance', 'estimated_duration', 'status', 'status_detail', 'updated_at'])
+        
+        # Create Route
+        route = Route(
+            trip=trip,
+            polyline=route_data.get('polyline', ''),
+            waypoints=[current_coords, pickup_coords, dropoff_coords]
+        )
+        route.set_stops(route_data.get('stops', []))
+        route.save()
+        
+        # Create Daily Logs in a single INSERT, dated by the schedule itself
+        daily_logs = []
+        for day_idx, day_schedule in enumerate(hos_schedule['daily_schedules']):
+            daily_logs.append(DailyLog(
+                trip=trip,
+                log_date=date.fromisoformat(day_schedule['date']),
+                off_duty_hours=day_schedule['off_duty_hours'],
+                sleeper_berth_hours=day_schedule['sleeper_berth_hours'],
+                driving_hours=day_schedule['driving_hours'],
+                on_duty_hours=day_schedule['on_duty_hours'],
+                total_distance=day_schedule['total_distance'],
+                total_vehicle_miles=day_schedule['total_distance'],
+                remarks=f"Day {day_idx + 1} of {hos_schedule['total_days']}"
+            ))
+        
+        DailyLog.objects.bulk_create(daily_logs, batch_size=50)
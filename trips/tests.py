@@ -1,3 +1,455 @@
-from django.test import TestCase
+from datetime import date, datetime, timedelta
+import json
+from unittest import mock
 
-# Create your tests here.
+import orjson
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import Trip, DailyLog, Route
+from .renderers import ORJSONRenderer
+from .serializers import RouteSerializer
+from .tasks import calculate_route_task
+from .utils import (
+    encode_polyline, polyline_from_geometry, generate_hos_schedule, geocode_address, geocode_addresses_batch,
+    _geocode_cached,
+)
+
+
+def make_trip(**kwargs):
+    fields = {
+        'current_location': 'Chicago, IL',
+        'pickup_location': 'St. Louis, MO',
+        'dropoff_location': 'Denver, CO',
+        'current_cycle_used': 10,
+    }
+    fields.update(kwargs)
+    return Trip.objects.create(**fields)
+
+
+def decode_polyline(encoded, precision=5):
+    """Reference Google polyline decoder, returns [lng, lat] pairs"""
+    factor = 10 ** precision
+    points = []
+    index = lat = lng = 0
+    while index < len(encoded):
+        deltas = []
+        for _ in range(2):
+            result = shift = 0
+            while True:
+                byte = ord(encoded[index]) - 63
+                index += 1
+                result |= (byte & 0x1f) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            deltas.append(~(result >> 1) if result & 1 else result >> 1)
+        lat += deltas[0]
+        lng += deltas[1]
+        points.append([lng / factor, lat / factor])
+    return points
+
+
+class EncodePolylineTests(TestCase):
+    GOOGLE_SAMPLE = [[-120.2, 38.5], [-120.95, 40.7], [-126.453, 43.252]]
+    GOOGLE_ENCODED = "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+
+    def test_google_sample(self):
+        self.assertEqual(encode_polyline(self.GOOGLE_SAMPLE), self.GOOGLE_ENCODED)
+
+    def test_round_trip(self):
+        coords = [[-87.62979, 41.87811], [-90.19940, 38.62700], [-104.99025, 39.73915], [0.0, 0.0]]
+        self.assertEqual(decode_polyline(encode_polyline(coords)), coords)
+
+    def test_geometry_variants(self):
+        self.assertEqual(polyline_from_geometry("abc"), "abc")
+        self.assertEqual(
+            polyline_from_geometry({"type": "LineString", "coordinates": self.GOOGLE_SAMPLE}),
+            self.GOOGLE_ENCODED
+        )
+        self.assertEqual(polyline_from_geometry(None), "")
+
+
+
+CHICAGO = {'lat': 41.87811, 'lng': -87.62979}
+
+
+class GeocodeCacheTests(TestCase):
+    def setUp(self):
+        _geocode_cached.cache_clear()
+        cache.clear()
+        self.addCleanup(_geocode_cached.cache_clear)
+
+    @mock.patch('trips.utils._geocode_uncached', return_value=CHICAGO)
+    def test_repeat_lookups_hit_the_cache(self, uncached):
+        self.assertEqual(geocode_address('Chicago, IL', 'key'), CHICAGO)
+        self.assertEqual(geocode_address('  chicago, il ', 'key'), CHICAGO)
+        uncached.assert_called_once_with('chicago, il', 'key')
+
+        # A fresh process still finds it in the shared cache
+        _geocode_cached.cache_clear()
+        self.assertEqual(geocode_address('Chicago, IL', 'key'), CHICAGO)
+        uncached.assert_called_once()
+
+    @mock.patch('trips.utils._geocode_uncached', side_effect=[None, CHICAGO])
+    def test_failed_lookups_are_not_cached(self, uncached):
+        self.assertIsNone(geocode_address('Chicago, IL', 'key'))
+        self.assertEqual(geocode_address('Chicago, IL', 'key'), CHICAGO)
+        self.assertEqual(uncached.call_count, 2)
+
+    @mock.patch('trips.utils._geocode_uncached', return_value=CHICAGO)
+    def test_callers_get_a_copy(self, uncached):
+        geocode_address('Chicago, IL', 'key')['lat'] = 0
+        self.assertEqual(geocode_address('Chicago, IL', 'key'), CHICAGO)
+        uncached.assert_called_once()
+
+    @mock.patch('trips.utils._geocode_uncached', return_value=CHICAGO)
+    @mock.patch('trips.utils.cache')
+    def test_unreachable_cache_falls_back_to_ors(self, shared_cache, uncached):
+        shared_cache.get.side_effect = ConnectionError("Error 111 connecting to localhost:6379")
+        shared_cache.set.side_effect = ConnectionError("Error 111 connecting to localhost:6379")
+        self.assertEqual(geocode_address('Chicago, IL', 'key'), CHICAGO)
+        uncached.assert_called_once()
+
+
+class GeocodeBatchTests(TestCase):
+    DENVER = {'lat': 39.73915, 'lng': -104.99025}
+
+    def setUp(self):
+        _geocode_cached.cache_clear()
+        cache.clear()
+        self.addCleanup(_geocode_cached.cache_clear)
+
+    @mock.patch('trips.utils._geocode_uncached')
+    def test_dedupes_and_keeps_input_order(self, uncached):
+        uncached.side_effect = lambda address, maps_api_key: {
+            'chicago, il': CHICAGO, 'denver, co': self.DENVER,
+        }.get(address)
+        coords = geocode_addresses_batch(
+            ['Chicago, IL', 'Nowhere', ' CHICAGO, il', 'Denver, CO', 'chicago, il'], 'key'
+        )
+        self.assertEqual(coords, [CHICAGO, None, CHICAGO, self.DENVER, CHICAGO])
+        self.assertCountEqual(
+            [call.args[0] for call in uncached.call_args_list], ['chicago, il', 'nowhere', 'denver, co']
+        )
+
+        # Each position is its own copy
+        coords[0]['lat'] = 0
+        self.assertEqual(coords[2], CHICAGO)
+        self.assertIsNot(coords[2], coords[4])
+
+    def test_empty_batch(self):
+        self.assertEqual(geocode_addresses_batch([], 'key'), [])
+
+class DailyLogTimelineTests(TestCase):
+    def test_set_timeline_merges_consecutive_statuses(self):
+        log = DailyLog()
+        log.set_timeline([
+            {'hour': 6, 'minute': 0, 'duty_status': 'DRIVING'},
+            {'hour': 0, 'minute': 0, 'duty_status': 'OFF'},
+            {'hour': 3, 'minute': 0, 'duty_status': 'OFF'},
+            {'hour': 12, 'minute': 30, 'duty_status': 'ON_DUTY', 'notes': 'Fuel'},
+            {'hour': 8, 'minute': 0, 'duty_status': 'DRIVING'},
+            {'hour': 13, 'minute': 0, 'duty_status': 'DRIVING'},
+        ])
+        self.assertEqual(log.entries_rle, [
+            [0, 360, 'OFF', '', ''],
+            [360, 390, 'DRIVING', '', ''],
+            [750, 30, 'ON_DUTY', '', 'Fuel'],
+            [780, 660, 'DRIVING', '', ''],
+        ])
+
+    def test_set_timeline_keeps_last_event_at_same_minute(self):
+        log = DailyLog()
+        log.set_timeline([
+            {'hour': 5, 'minute': 0, 'duty_status': 'SLEEPER'},
+            {'hour': 5, 'minute': 0, 'duty_status': 'OFF', 'location': 'Yard'},
+        ])
+        self.assertEqual(log.entries_rle, [[300, 1140, 'OFF', 'Yard', '']])
+
+    def test_timeline_entries_expands_runs(self):
+        log = DailyLog(entries_rle=[[0, 360, 'OFF', '', ''], [390, 1050, 'DRIVING', 'I-70', '']])
+        self.assertEqual(log.timeline_entries(), [
+            {'id': None, 'hour': 0, 'minute': 0, 'duty_status': 'OFF', 'location': '', 'notes': ''},
+            {'id': None, 'hour': 6, 'minute': 30, 'duty_status': 'DRIVING', 'location': 'I-70', 'notes': ''},
+        ])
+
+
+class UpdateEntriesTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.log = DailyLog.objects.create(trip=make_trip(), log_date=date(2026, 1, 1))
+        self.url = f'/api/logs/{self.log.pk}/update_entries/'
+
+    def test_stores_timeline_and_drops_unknown_keys(self):
+        response = self.client.post(self.url, {'entries': [
+            {'hour': 0, 'duty_status': 'OFF', 'bogus': 1},
+            {'hour': 6, 'minute': 15, 'duty_status': 'DRIVING', 'location': 'Springfield'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(e['hour'], e['minute'], e['duty_status']) for e in response.json()['entries']],
+            [(0, 0, 'OFF'), (6, 15, 'DRIVING')]
+        )
+
+    def test_rejects_invalid_entries(self):
+        invalid = [
+            [{'hour': 0, 'duty_status': 'OFF'}, {'hour': 0, 'duty_status': None}],
+            [{'hour': 3}],
+            [{'hour': 3, 'duty_status': 'NAPPING'}],
+            [{'hour': 24, 'duty_status': 'OFF'}],
+            [{'hour': 1, 'minute': 60, 'duty_status': 'OFF'}],
+        ]
+        for entries in invalid:
+            with self.subTest(entries=entries):
+                response = self.client.post(self.url, {'entries': entries}, format='json')
+                self.assertEqual(response.status_code, 400)
+        self.log.refresh_from_db()
+        self.assertEqual(self.log.entries_rle, [])
+
+
+class GenerateHosScheduleTests(TestCase):
+    """Pins generate_hos_schedule output so kernel changes stay behaviour-preserving"""
+
+    def day(self, log_date, off, driving, on_duty, distance):
+        segments = [{'distance': distance, 'duration': driving}] if driving else []
+        return {
+            'date': log_date,
+            'off_duty_hours': off,
+            'sleeper_berth_hours': 0.0,
+            'driving_hours': driving,
+            'on_duty_hours': on_duty,
+            'driving_segments': segments,
+            'rest_breaks': [],
+            'total_distance': distance,
+        }
+
+    def test_single_day(self):
+        self.assertEqual(generate_hos_schedule(300, 0, start_date='2026-01-01'), {
+            'daily_schedules': [self.day('2026-01-01', 7.0, 5.0, 2.0, 300.0)],
+            'total_days': 1,
+            'total_distance': 300,
+            'available_driving_hours_today': 11,
+            'remaining_cycle_hours': 63.0,
+        })
+
+    def test_multi_day_with_cycle_used(self):
+        self.assertEqual(generate_hos_schedule(1200, 35.5, start_date='2026-01-01'), {
+            'daily_schedules': [
+                self.day('2026-01-01', 1.0, 11.0, 2.0, 660.0),
+                self.day('2026-01-02', 5.0, 9.0, 0.0, 540.0),
+            ],
+            'total_days': 2,
+            'total_distance': 1200,
+            'available_driving_hours_today': -1.0,
+            'remaining_cycle_hours': 12.5,
+        })
+
+    def test_cycle_nearly_exhausted(self):
+        result = generate_hos_schedule(2500, 69.5, start_date='2026-01-01')
+        self.assertEqual(result['total_days'], 11)
+        self.assertEqual(result['remaining_cycle_hours'], 0)
+        self.assertEqual(result['available_driving_hours_today'], -69.0)
+        self.assertEqual(
+            [schedule['driving_hours'] for schedule in result['daily_schedules']],
+            [0.5, 11.0, 11.0, 11.0, 8.17, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+        )
+        self.assertEqual(result['daily_schedules'][4], self.day('2026-01-05', 5.83, 8.17, 0.0, 490.0))
+        self.assertEqual(result['daily_schedules'][-1]['date'], '2026-01-11')
+
+    def test_start_date_types(self):
+        expected = generate_hos_schedule(1200, 35.5, start_date='2026-01-01')
+        self.assertEqual(generate_hos_schedule(1200, 35.5, start_date=date(2026, 1, 1)), expected)
+        self.assertEqual(generate_hos_schedule(1200, 35.5, start_date=datetime(2026, 1, 1, 8, 30)), expected)
+
+
+class CalculateRouteTaskTests(TestCase):
+    @mock.patch('trips.tasks.plan_trip')
+    def test_skips_trips_that_are_not_pending(self, plan_trip):
+        for trip_status in (Trip.STATUS_COMPLETE, Trip.STATUS_FAILED):
+            trip = make_trip(status=trip_status)
+            calculate_route_task(trip.id)
+            trip.refresh_from_db()
+            self.assertEqual(trip.status, trip_status)
+        plan_trip.assert_not_called()
+
+    @mock.patch.dict('os.environ', {'OPENROUTE_API_KEY': ''})
+    def test_marks_pending_trip_failed(self):
+        trip = make_trip(status=Trip.STATUS_PENDING)
+        calculate_route_task(trip.id)
+        trip.refresh_from_db()
+        self.assertEqual(trip.status, Trip.STATUS_FAILED)
+        self.assertEqual(trip.status_detail, "Maps API key not configured")
+
+
+    @mock.patch.dict('os.environ', {'OPENROUTE_API_KEY': 'test-key'})
+    @mock.patch('trips.tasks.calculate_route')
+    @mock.patch('trips.tasks.geocode_addresses_batch')
+    def test_completes_trip_without_clobbering_concurrent_edits(self, geocode, route):
+        trip = make_trip(status=Trip.STATUS_PENDING)
+
+        def edit_during_geocode(addresses, maps_api_key):
+            Trip.objects.filter(pk=trip.pk).update(current_location='Edited, IL')
+            return [{'lat': 41.9, 'lng': -87.6}, {'lat': 38.6, 'lng': -90.2}, {'lat': 39.7, 'lng': -105.0}]
+
+        geocode.side_effect = edit_during_geocode
+        route.return_value = {'distance': 1200, 'duration': 20, 'polyline': 'abc', 'stops': []}
+        calculate_route_task(trip.id)
+        trip.refresh_from_db()
+        self.assertEqual(trip.status, Trip.STATUS_COMPLETE)
+        self.assertEqual(trip.total_distance, 1200)
+        self.assertEqual(trip.current_location, 'Edited, IL')
+        self.assertEqual(trip.daily_logs.count(), 2)
+
+    @mock.patch.dict('os.environ', {'OPENROUTE_API_KEY': 'test-key'})
+    @mock.patch('trips.tasks.calculate_route')
+    @mock.patch('trips.tasks.geocode_addresses_batch')
+    def test_log_dates_come_from_the_schedule(self, geocode, route):
+        geocode.return_value = [CHICAGO, CHICAGO, CHICAGO]
+        route.return_value = {'distance': 1200, 'duration': 20, 'polyline': 'abc', 'stops': []}
+        trip = make_trip(status=Trip.STATUS_PENDING)
+        schedule = lambda *args, **kwargs: generate_hos_schedule(*args, start_date='2026-01-01', **kwargs)
+        with mock.patch('trips.tasks.generate_hos_schedule', side_effect=schedule):
+            calculate_route_task(trip.id)
+        self.assertEqual(
+            list(trip.daily_logs.order_by('log_date').values_list('log_date', flat=True)),
+            [date(2026, 1, 1), date(2026, 1, 2)]
+        )
+
+class CalculateRouteViewTests(TransactionTestCase):
+    # Real commits, so on_commit queues the task before the response is built
+    TRIP = {
+        'current_location': 'Chicago, IL',
+        'pickup_location': 'St. Louis, MO',
+        'dropoff_location': 'Denver, CO',
+        'current_cycle_used': 10,
+    }
+
+    @mock.patch.dict('os.environ', {'OPENROUTE_API_KEY': 'test-key'})
+    @mock.patch('trips.views.calculate_route_task')
+    def test_queues_pending_trip(self, task):
+        response = APIClient().post('/api/trips/calculate_route/', self.TRIP, format='json')
+        self.assertEqual(response.status_code, 202)
+        trip = Trip.objects.get(pk=response.json()['trip_id'])
+        self.assertEqual(trip.status, Trip.STATUS_PENDING)
+        self.assertTrue(response.json()['status_url'].endswith(f'/api/trips/{trip.id}/'))
+        task.delay.assert_called_once_with(trip.id)
+
+    @mock.patch.dict('os.environ', {'OPENROUTE_API_KEY': 'test-key'})
+    @mock.patch('trips.views.calculate_route_task')
+    def test_reports_trip_planned_inline(self, task):
+        # Eager mode: the task finishes before the response is built
+        task.delay.side_effect = lambda trip_id: Trip.objects.filter(pk=trip_id).update(status=Trip.STATUS_COMPLETE)
+        response = APIClient().post('/api/trips/calculate_route/', self.TRIP, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['status'], Trip.STATUS_COMPLETE)
+
+    @mock.patch.dict('os.environ', {'OPENROUTE_API_KEY': 'test-key'})
+    @mock.patch('trips.views.calculate_route_task')
+    def test_fails_trip_when_broker_is_unreachable(self, task):
+        task.delay.side_effect = ConnectionError("Error 111 connecting to localhost:6379")
+        response = APIClient().post('/api/trips/calculate_route/', self.TRIP, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['status'], Trip.STATUS_FAILED)
+        trip = Trip.objects.get(pk=response.json()['trip_id'])
+        self.assertEqual(trip.status, Trip.STATUS_FAILED)
+        self.assertIn("Error 111", trip.status_detail)
+
+
+class TripConditionalGetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.trip = make_trip()
+        self.logs = [
+            DailyLog.objects.create(trip=self.trip, log_date=date(2026, 1, day))
+            for day in (1, 2)
+        ]
+        self.url = f'/api/trips/{self.trip.pk}/'
+
+    def get(self, url=None, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(url or self.url, **headers)
+
+    def test_retrieve_revalidates(self):
+        for url in (self.url, f'{self.url}route_info/'):
+            with self.subTest(url=url):
+                response = self.get(url)
+                etag = response['ETag']
+                self.assertIn('no-cache', response['Cache-Control'])
+                self.assertEqual(self.get(url, etag).status_code, 304)
+
+    def test_editing_a_log_changes_etag(self):
+        etag = self.get()['ETag']
+        response = self.client.patch(f'/api/logs/{self.logs[0].pk}/', {'remarks': 'Edited'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        response = self.get(etag=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_deleting_a_log_changes_etag_and_last_modified(self):
+        # Last-Modified has one-second resolution, so start from an older version
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+        Trip.objects.filter(pk=self.trip.pk).update(updated_at=an_hour_ago)
+        DailyLog.objects.filter(trip=self.trip).update(updated_at=an_hour_ago)
+        first = self.get()
+        response = self.client.delete(f'/api/logs/{self.logs[1].pk}/')
+        self.assertEqual(response.status_code, 204)
+        response = self.get(etag=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['daily_logs']), 1)
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, 200)
+
+
+class EncodedStopsTests(TestCase):
+    STOPS = [{'type': 'fuel', 'location': 'Mile 1000', 'lat': 40.1, 'lng': -95.2}]
+
+    def render(self, route):
+        return json.loads(ORJSONRenderer().render(RouteSerializer(route).data))['stops']
+
+    def test_encoded_stops_pass_through_as_fragment(self):
+        route = Route(trip=make_trip(), polyline='abc')
+        route.set_stops(self.STOPS)
+        route.save()
+        route.refresh_from_db()
+        self.assertEqual(route.stops, [])
+        stops = RouteSerializer(route).data['stops']
+        self.assertIsInstance(stops, orjson.Fragment)
+        self.assertEqual(self.render(route), self.STOPS)
+
+    def test_legacy_rows_fall_back_to_json_field(self):
+        route = Route.objects.create(trip=make_trip(), polyline='abc', stops=self.STOPS)
+        self.assertIsNone(route.stops_bin)
+        self.assertEqual(RouteSerializer(route).data['stops'], self.STOPS)
+        self.assertEqual(self.render(route), self.STOPS)
+
+
+class TripListTests(TestCase):
+    def setUp(self):
+        for _ in range(3):
+            trip = make_trip(total_distance=1200)
+            route = Route(trip=trip, polyline='x' * 5000, waypoints=[CHICAGO])
+            route.set_stops([])
+            route.save()
+            for day in (1, 2):
+                log = DailyLog.objects.create(trip=trip, log_date=date(2026, 1, day))
+                log.entries.create(hour=0, duty_status='OFF')
+
+    def test_list_prefetches_and_omits_polyline(self):
+        # Trips + routes, daily logs, log entries; constant in the number of trips
+        with self.assertNumQueries(3) as queries:
+            response = APIClient().get('/api/trips/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('polyline', queries.captured_queries[0]['sql'].split(' FROM ')[0])
+        trips = response.json()
+        self.assertEqual(len(trips), 3)
+        for trip in trips:
+            self.assertNotIn('polyline', trip['route'])
+            self.assertEqual(len(trip['daily_logs']), 2)
+
+    def test_detail_keeps_polyline(self):
+        trip = Trip.objects.first()
+        response = APIClient().get(f'/api/trips/{trip.pk}/')
+        self.assertEqual(response.json()['route']['polyline'], 'x' * 5000)
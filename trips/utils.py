@@ -2,8 +2,25 @@
 Utility functions for HOS (Hours of Service) calculations and trip planning
 Based on FMCSA regulations for 70-hour/8-day cycle
 """
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 from math import ceil
+import hashlib
+
+import numpy as np
+import requests
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional, fall back to plain Python
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
 
 # Constants for HOS regulations
 MAX_CONTINUOUS_DRIVING = 11  # Hours
@@ -14,43 +31,147 @@ MAX_HOURS_PER_CYCLE = 70  # 70-hour/8-day cycle
 CYCLE_DAYS = 8  # Rolling 8-day cycle
 FUEL_INTERVAL = 1000  # Miles between fuel stops
 PICKUP_DROPOFF_TIME = 1  # Hour for each
+MAX_SCHEDULE_DAYS = 11  # Safety limit on planned days
+SEGMENTS_PER_DAY = ceil(DRIVING_WINDOW / MAX_CONTINUOUS_DRIVING)  # Max driving segments in one window
+
+EARTH_RADIUS_MILES = 3959.0
 
 # Average speeds
 AVERAGE_HIGHWAY_SPEED = 60  # mph
 AVERAGE_CITY_SPEED = 35  # mph
 
+# OpenRouteService HTTP settings
+ORS_TIMEOUT = 5  # Seconds
+ORS_GEOCODE_URL = "https://api.openrouteservice.org/geocode/search"
+ORS_DIRECTIONS_URL = "https://api.openrouteservice.org/v2/directions/driving-car"
+
+# Geocode caching
+GEOCODE_CACHE_TTL = 60 * 60 * 24 * 30  # 30 days
+GEOCODE_LRU_SIZE = 4096
+GEOCODE_MAX_WORKERS = 8
+
+
+def _build_session():
+    """Build a pooled session so repeated ORS calls reuse TCP/TLS connections"""
+    session = requests.Session()
+    session.headers.update({"Accept": "application/json"})
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        max_retries=Retry(total=2, backoff_factor=0.2)
+    )
+    session.mount("https://", adapter)
+    return session
+
+
+_SESSION = _build_session()
+
+
+class _GeocodeMiss(Exception):
+    """Raised so lru_cache doesn't remember failed lookups"""
+
+
+def _geocode_cache_key(normalized_address):
+    digest = hashlib.blake2b(normalized_address.encode(), digest_size=16).hexdigest()
+    return f"geo:{digest}"
+
+
+@lru_cache(maxsize=GEOCODE_LRU_SIZE)
+def _geocode_cached(normalized_address, maps_api_key):
+    """Process-local cache in front of the shared Django cache"""
+    key = _geocode_cache_key(normalized_address)
+    # The shared cache is only an optimisation, so an unreachable Redis falls
+    # through to ORS instead of failing the lookup
+    try:
+        hit = cache.get(key)
+    except Exception as e:
+        print(f"Geocode cache error: {e}")
+        hit = None
+    if hit is not None:
+        return hit
+    
+    result = _geocode_uncached(normalized_address, maps_api_key)
+    if result is None:
+        raise _GeocodeMiss(normalized_address)
+    
+    try:
+        cache.set(key, result, GEOCODE_CACHE_TTL)
+    except Exception as e:
+        print(f"Geocode cache error: {e}")
+    return result
+
 
 def geocode_address(address, maps_api_key):
     """
     Geocode an address using OpenRouteService (free alternative to Google Maps)
+    Results are cached per normalized address, failed lookups are not.
     Returns: {"lat": latitude, "lng": longitude}
     """
+    normalized_address = address.strip().lower()
     try:
-        import requests
-        
-        # Using OpenRouteService which has a free tier
-        url = "https://api.openrouteservice.org/geocode/search"
-        params = {
-            "text": address,
-            "api_key": maps_api_key
-        }
-        
-        response = requests.get(url, params=params)
+        return dict(_geocode_cached(normalized_address, maps_api_key))
+    except _GeocodeMiss:
+        return None
+
+
+def geocode_addresses_batch(addresses, maps_api_key):
+    """
+    Geocode several addresses with one call
+    The public ORS geocoder has no multi-search endpoint, so duplicate
+    addresses are collapsed and the rest are looked up in parallel over the
+    pooled session.
+    Returns: list of {"lat": ..., "lng": ...} (or None), aligned to input order
+    """
+    unique = list(dict.fromkeys(address.strip().lower() for address in addresses))
+    if not unique:
+        return []
+    
+    with ThreadPoolExecutor(max_workers=min(len(unique), GEOCODE_MAX_WORKERS)) as executor:
+        results = dict(zip(
+            unique,
+            executor.map(lambda address: geocode_address(address, maps_api_key), unique)
+        ))
+    
+    coords = []
+    for address in addresses:
+        result = results[address.strip().lower()]
+        coords.append(dict(result) if result else None)
+    return coords
+
+
+def _geocode_uncached(address, maps_api_key):
+    """Geocode an address against OpenRouteService without any caching"""
+    try:
+        response = _SESSION.get(
+            ORS_GEOCODE_URL, params=_geocode_params(address, maps_api_key), timeout=ORS_TIMEOUT
+        )
         
         if response.status_code == 200:
-            data = response.json()
-            if data.get('features'):
-                coords = data['features'][0]['geometry']['coordinates']
-                return {
-                    "lat": coords[1],
-                    "lng": coords[0]
-                }
+            return _parse_geocode(response.json())
     except Exception as e:
         print(f"Geocoding error: {e}")
     
     return None
 
 
+def _geocode_params(address, maps_api_key):
+    # Using OpenRouteService which has a free tier
+    return {
+        "text": address,
+        "api_key": maps_api_key
+    }
+
+
+def _parse_geocode(data):
+    if data.get('features'):
+        coords = data['features'][0]['geometry']['coordinates']
+        return {
+            "lat": coords[1],
+            "lng": coords[0]
+        }
+    return None
+
+
 def calculate_route(from_coords, to_coords, via_pickup=None, maps_api_key=None):
     """
     Calculate route using OpenRouteService Matrix API
@@ -63,76 +184,136 @@ def calculate_route(from_coords, to_coords, via_pickup=None, maps_api_key=None):
     }
     """
     try:
-        import requests
-        
-        # Build coordinates array
-        coords = [
-            [from_coords['lng'], from_coords['lat']],
-        ]
-        
-        if via_pickup:
-            coords.append([via_pickup['lng'], via_pickup['lat']])
+        coords, headers, payload = _route_request(from_coords, to_coords, via_pickup, maps_api_key)
         
-        coords.append([to_coords['lng'], to_coords['lat']])
-        
-        # OpenRouteService directions API
-        url = "https://api.openrouteservice.org/v2/directions/driving-car"
-        headers = {
-            "Accept": "application/json, application/geo+json, application/gpx+xml, img/png; charset=utf-8",
-            "Authorization": f"bearer {maps_api_key}",
-            "Content-Type": "application/json;charset=utf-8"
-        }
-        
-        payload = {
-            "coordinates": coords,
-            "geometry": True,
-            "instructions": True
-        }
-        
-        response = requests.post(url, json=payload, headers=headers)
+        response = _SESSION.post(ORS_DIRECTIONS_URL, json=payload, headers=headers, timeout=ORS_TIMEOUT)
         
         print(f"Response status: {response.status_code}")
         
         if response.status_code == 200:
-            data = response.json()
-            route = data['routes'][0]
-            
-            distance_meters = route['summary']['distance']
-            duration_seconds = route['summary']['duration']
-            
-            # Convert to miles and hours
-            distance_miles = distance_meters / 1609.34
-            duration_hours = duration_seconds / 3600
-            
-            return {
-                "distance": round(distance_miles, 2),
-                "duration": round(duration_hours, 2),
-                "polyline": route['geometry'],
-                "stops": calculate_stops(distance_miles, coords, via_pickup is not None),
-                "instructions": route.get('segments', [])
-            }
+            return _parse_route(response.json(), coords, via_pickup is not None)
     except Exception as e:
         print(f"Route calculation error: {e}")
-        # Fallback to simple calculation
-        import math
-        lat1, lon1 = from_coords['lat'], from_coords['lng']
-        lat2, lon2 = to_coords['lat'], to_coords['lng']
+        return _fallback_route(from_coords, to_coords, via_pickup is not None)
+    
+    return None
+
+
+def _route_request(from_coords, to_coords, via_pickup, maps_api_key):
+    """Build the coordinates, headers and payload for an ORS directions request"""
+    # Build coordinates array
+    coords = [
+        [from_coords['lng'], from_coords['lat']],
+    ]
+    
+    if via_pickup:
+        coords.append([via_pickup['lng'], via_pickup['lat']])
+    
+    coords.append([to_coords['lng'], to_coords['lat']])
+    
+    # OpenRouteService directions API
+    headers = {
+        "Accept": "application/json, application/geo+json, application/gpx+xml, img/png; charset=utf-8",
+        "Authorization": f"bearer {maps_api_key}",
+        "Content-Type": "application/json;charset=utf-8"
+    }
+    
+    payload = {
+        "coordinates": coords,
+        "geometry": True,
+        "instructions": True
+    }
+    
+    return coords, headers, payload
+
+
+def _parse_route(data, coords, has_pickup):
+    route = data['routes'][0]
+    
+    distance_meters = route['summary']['distance']
+    duration_seconds = route['summary']['duration']
+    
+    # Convert to miles and hours
+    distance_miles = distance_meters / 1609.34
+    duration_hours = duration_seconds / 3600
+    
+    return {
+        "distance": round(distance_miles, 2),
+        "duration": round(duration_hours, 2),
+        "polyline": polyline_from_geometry(route.get('geometry')),
+        "stops": calculate_stops(distance_miles, coords, has_pickup),
+        "instructions": route.get('segments', [])
+    }
+
+
+def _fallback_route(from_coords, to_coords, has_pickup):
+    """Straight-line estimate used when the directions API fails"""
+    import math
+    lat1, lon1 = from_coords['lat'], from_coords['lng']
+    lat2, lon2 = to_coords['lat'], to_coords['lng']
+    
+    # Haversine formula
+    R = EARTH_RADIUS_MILES
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = math.sin(dlat/2)**2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon/2)**2
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+    distance_miles = R * c
+    
+    return {
+        "distance": round(distance_miles, 2),
+        "duration": round(distance_miles / AVERAGE_HIGHWAY_SPEED, 2),
+        "stops": calculate_stops(distance_miles, None, has_pickup)
+    }
+
+
+def encode_polyline(coords, precision=5):
+    """
+    Encode [lng, lat] pairs (GeoJSON order) with the Google polyline algorithm
+    Returns: compact ASCII string, decodable by any polyline library
+    """
+    factor = 10 ** precision
+    encoded = []
+    prev_lat = prev_lng = 0
+    
+    for point in coords:
+        lat = int(round(point[1] * factor))
+        lng = int(round(point[0] * factor))
         
-        # Haversine formula
-        R = 3959  # Earth radius in miles
-        dlat = math.radians(lat2 - lat1)
-        dlon = math.radians(lon2 - lon1)
-        a = math.sin(dlat/2)**2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon/2)**2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        distance_miles = R * c
+        for delta in (lat - prev_lat, lng - prev_lng):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                encoded.append(chr((0x20 | (value & 0x1f)) + 63))
+                value >>= 5
+            encoded.append(chr(value + 63))
         
-        return {
-            "distance": round(distance_miles, 2),
-            "duration": round(distance_miles / AVERAGE_HIGHWAY_SPEED, 2),
-            "stops": calculate_stops(distance_miles, None, via_pickup is not None)
-        }
+        prev_lat, prev_lng = lat, lng
     
-    return None
+    return "".join(encoded)
+
+
+def polyline_from_geometry(geometry):
+    """Return an encoded polyline for an ORS route geometry (string or GeoJSON)"""
+    if isinstance(geometry, str):
+        # ORS JSON responses are already polyline-encoded
+        return geometry
+    if isinstance(geometry, dict):
+        geometry = geometry.get('coordinates')
+    if isinstance(geometry, (list, tuple)):
+        return encode_polyline(geometry)
+    return ""
+
+
+def haversine_vector(lat1, lng1, lat2, lng2):
+    """
+    Great-circle distance in miles between arrays of points (degrees)
+    Use the math-based fallback in calculate_route for a single pair.
+    """
+    lat1r, lat2r = np.radians(lat1), np.radians(lat2)
+    dlat = lat2r - lat1r
+    dlon = np.radians(np.subtract(lng2, lng1))
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1r) * np.cos(lat2r) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(a))
 
 
 def calculate_stops(distance_miles, coords=None, has_pickup=False):
@@ -143,21 +324,27 @@ def calculate_stops(distance_miles, coords=None, has_pickup=False):
     num_fuel_stops = ceil(distance_miles / FUEL_INTERVAL) - 1
     
     if num_fuel_stops > 0 and coords:
-        # Simple linear interpolation for stop locations
-        for i in range(1, num_fuel_stops + 1):
-            ratio = (i * FUEL_INTERVAL) / distance_miles
-            if ratio < 1.0:
-                # Interpolate between first and last coordinate
-                if len(coords) >= 2:
-                    lat = coords[0][1] + (coords[-1][1] - coords[0][1]) * ratio
-                    lng = coords[0][0] + (coords[-1][0] - coords[0][0]) * ratio
-                    stops.append({
-                        "type": "fuel",
-                        "distance_at": round(i * FUEL_INTERVAL, 2),
-                        "duration_hours": 0.5,
-                        "lat": lat,
-                        "lng": lng
-                    })
+        ratios = np.arange(1, num_fuel_stops + 1) * FUEL_INTERVAL / distance_miles
+        ratios = ratios[ratios < 1.0]
+        
+        if len(coords) >= 2 and len(ratios):
+            # Interpolate along the waypoint legs, weighted by great-circle length
+            points = np.asarray(coords, dtype=float)
+            lngs, lats = points[:, 0], points[:, 1]
+            leg_miles = haversine_vector(lats[:-1], lngs[:-1], lats[1:], lngs[1:])
+            cumulative = np.concatenate(([0.0], np.cumsum(leg_miles)))
+            targets = ratios * cumulative[-1]
+            stop_lats = np.interp(targets, cumulative, lats)
+            stop_lngs = np.interp(targets, cumulative, lngs)
+            
+            for i, (lat, lng) in enumerate(zip(stop_lats, stop_lngs), start=1):
+                stops.append({
+                    "type": "fuel",
+                    "distance_at": round(i * FUEL_INTERVAL, 2),
+                    "duration_hours": 0.5,
+                    "lat": float(lat),
+                    "lng": float(lng)
+                })
     elif num_fuel_stops > 0:
         for i in range(1, num_fuel_stops + 1):
             stops.append({
@@ -169,126 +356,143 @@ def calculate_stops(distance_miles, coords=None, has_pickup=False):
     return stops
 
 
-def generate_hos_schedule(total_distance, current_cycle_hours, has_pickup=True, start_date=None):
+@njit(cache=True)
+def _hos_core(total_distance, current_cycle_hours, has_pickup):
     """
-    Generate an HOS-compliant schedule for the trip
-    
-    Returns: {
-        "daily_schedules": [
-            {
-                "date": "2026-02-21",
-                "off_duty_hours": 8.5,
-                "driving_hours": 11,
-                "on_duty_hours": 4.5,
-                "sleeper_berth_hours": 0,
-                "driving_segments": [
-                    {"start_time": "06:00", "duration": 11, "distance": 660}
-                ]
-            }
-        ],
-        "total_days": 2,
-        "available_driving_hours_today": 11,
-        "remaining_cycle_hours": 45
-    }
+    Numeric core of generate_hos_schedule, kept to plain floats for numba
+    Returns: (days, segments, used_cycle_hours) where each days row is
+    [driving, on_duty, off_duty, sleeper_berth, distance, rest_breaks,
+    first_segment, num_segments] and each segments row is [distance, duration]
     """
-    
-    if start_date is None:
-        start_date = datetime.now()
-    else:
-        start_date = datetime.fromisoformat(start_date)
-    
-    # Calculate time needed
     pickup_time = PICKUP_DROPOFF_TIME if has_pickup else 0
-    dropoff_time = PICKUP_DROPOFF_TIME
-    total_on_duty_time = pickup_time + dropoff_time
-    
-    # Estimate driving time at 60 mph
-    driving_time = total_distance / AVERAGE_HIGHWAY_SPEED
-    
-    # Fuel stops
-    num_fuel_stops = ceil(total_distance / FUEL_INTERVAL) - 1
-    fuel_stop_time = num_fuel_stops * 0.5
-    
-    total_time_needed = driving_time + total_on_duty_time + fuel_stop_time
-    
-    # Available hours today
-    remaining_cycle = MAX_HOURS_PER_CYCLE - current_cycle_hours
-    available_today = min(DRIVING_WINDOW, remaining_cycle)
-    
-    # Calculate driving hours available
-    available_driving_hours = min(MAX_CONTINUOUS_DRIVING, remaining_cycle)
-    
-    # Create schedule
-    daily_schedules = []
-    current_date = start_date
+    remaining_on_duty = float(pickup_time + PICKUP_DROPOFF_TIME)
     remaining_distance = total_distance
-    remaining_driving_time = driving_time
-    remaining_on_duty = total_on_duty_time
+    remaining_driving_time = total_distance / AVERAGE_HIGHWAY_SPEED
+    remaining_cycle = MAX_HOURS_PER_CYCLE - current_cycle_hours
+    available_driving_hours = min(float(MAX_CONTINUOUS_DRIVING), remaining_cycle)
     used_cycle_hours = current_cycle_hours
     
-    while remaining_distance > 0 or remaining_on_duty > 0:
-        day_schedule = {
-            "date": current_date.strftime("%Y-%m-%d"),
-            "off_duty_hours": 0,
-            "sleeper_berth_hours": 0,
-            "driving_hours": 0,
-            "on_duty_hours": 0,
-            "driving_segments": [],
-            "rest_breaks": []
-        }
+    days = np.zeros((MAX_SCHEDULE_DAYS, 8))
+    segments = np.zeros((MAX_SCHEDULE_DAYS * SEGMENTS_PER_DAY, 2))
+    num_days = 0
+    num_segments = 0
+    
+    while (remaining_distance > 0 or remaining_on_duty > 0) and num_days < MAX_SCHEDULE_DAYS:
+        day = days[num_days]
+        day[6] = num_segments
         
         # Calculate what can be done today
-        available_for_today = DRIVING_WINDOW
+        available_for_today = float(DRIVING_WINDOW)
         driving_today = min(available_driving_hours, remaining_driving_time, available_for_today - 0.5)  # -0.5 for mandatory break
         
         # Driving happens with mandatory 30-min rest break after 8 hours
-        segments = []
-        driving_done = 0
+        driving_done = 0.0
+        day_distance = 0.0
+        on_duty_hours = 0.0
         
         while driving_done < driving_today and remaining_distance > 0:
-            segment_duration = min(MAX_CONTINUOUS_DRIVING, driving_today - driving_done)
+            segment_duration = min(float(MAX_CONTINUOUS_DRIVING), driving_today - driving_done)
             segment_distance = segment_duration * AVERAGE_HIGHWAY_SPEED
             
-            segments.append({
-                "distance": round(segment_distance, 2),
-                "duration": round(segment_duration, 2)
-            })
+            segments[num_segments, 0] = round(segment_distance, 2)
+            segments[num_segments, 1] = round(segment_duration, 2)
+            num_segments += 1
             
             driving_done += segment_duration
+            day_distance += segment_distance
             remaining_distance -= segment_distance
             
             if driving_done < driving_today:
-                day_schedule["rest_breaks"].append({
-                    "duration": MANDATORY_REST_BREAK,
-                    "reason": "Mandatory 30-min rest"
-                })
-                day_schedule["on_duty_hours"] += MANDATORY_REST_BREAK
+                day[5] += 1
+                on_duty_hours += MANDATORY_REST_BREAK
         
-        day_schedule["driving_hours"] = round(driving_done, 2)
-        day_schedule["driving_segments"] = segments
+        driving_hours = round(driving_done, 2)
         remaining_driving_time -= driving_done
         
         # On-duty time (pickup, dropoff, fuel stops)
         on_duty_today = min(remaining_on_duty, available_for_today - driving_done)
-        day_schedule["on_duty_hours"] += round(on_duty_today, 2)
+        on_duty_hours += round(on_duty_today, 2)
         remaining_on_duty -= on_duty_today
         
         # Rest time
-        hours_used_today = day_schedule["driving_hours"] + day_schedule["on_duty_hours"]
+        hours_used_today = driving_hours + on_duty_hours
         if hours_used_today < DRIVING_WINDOW:
-            day_schedule["off_duty_hours"] = round(DRIVING_WINDOW - hours_used_today, 2)
+            day[2] = round(DRIVING_WINDOW - hours_used_today, 2)
         else:
             # Need full rest
-            day_schedule["sleeper_berth_hours"] = round(MIN_REST_BREAK, 2)
-        
-        daily_schedules.append(day_schedule)
+            day[3] = round(float(MIN_REST_BREAK), 2)
         
-        used_cycle_hours += day_schedule["driving_hours"] + day_schedule["on_duty_hours"]
-        available_driving_hours = MAX_CONTINUOUS_DRIVING  # Reset for next day
-        current_date += timedelta(days=1)
+        day[0] = driving_hours
+        day[1] = on_duty_hours
+        day[4] = round(day_distance, 2)
+        day[7] = num_segments - day[6]
+        num_days += 1
         
-        if len(daily_schedules) > 10:  # Safety limit
-            break
+        used_cycle_hours += driving_hours + on_duty_hours
+        available_driving_hours = float(MAX_CONTINUOUS_DRIVING)  # Reset for next day
+    
+    return days[:num_days], segments[:num_segments], used_cycle_hours
+
+
+def generate_hos_schedule(total_distance, current_cycle_hours, has_pickup=True, start_date=None):
+    """
+    Generate an HOS-compliant schedule for the trip
+    
+    Returns: {
+        "daily_schedules": [
+            {
+                "date": "2026-02-21",
+                "off_duty_hours": 8.5,
+                "driving_hours": 11,
+                "on_duty_hours": 4.5,
+                "sleeper_berth_hours": 0,
+                "driving_segments": [
+                    {"start_time": "06:00", "duration": 11, "distance": 660}
+                ],
+                "total_distance": 660
+            }
+        ],
+        "total_days": 2,
+        "available_driving_hours_today": 11,
+        "remaining_cycle_hours": 45
+    }
+    """
+    
+    if start_date is None:
+        base_date = date.today()
+    elif isinstance(start_date, str):
+        base_date = datetime.fromisoformat(start_date).date()
+    elif isinstance(start_date, datetime):
+        base_date = start_date.date()
+    else:
+        base_date = start_date
+    
+    days, segments, used_cycle_hours = _hos_core(
+        float(total_distance), float(current_cycle_hours), bool(has_pickup)
+    )
+    segments = segments.tolist()
+    
+    daily_schedules = []
+    for day_index, (driving, on_duty, off_duty, sleeper, distance, breaks, first, count) in enumerate(days.tolist()):
+        first, count = int(first), int(count)
+        daily_schedules.append({
+            "date": (base_date + timedelta(days=day_index)).isoformat(),
+            "off_duty_hours": off_duty,
+            "sleeper_berth_hours": sleeper,
+            "driving_hours": driving,
+            "on_duty_hours": on_duty,
+            "driving_segments": [
+                {"distance": seg_distance, "duration": seg_duration}
+                for seg_distance, seg_duration in segments[first:first + count]
+            ],
+            "rest_breaks": [
+                {"duration": MANDATORY_REST_BREAK, "reason": "Mandatory 30-min rest"}
+                for _ in range(int(breaks))
+            ],
+            "total_distance": distance
+        })
+    
+    remaining_cycle = MAX_HOURS_PER_CYCLE - current_cycle_hours
     
     return {
         "daily_schedules": daily_schedules,
@@ -2,13 +2,61 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Prefetch
+from django.urls import reverse
 from django.utils import timezone
-from datetime import datetime, timedelta
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+import hashlib
 import os
 
-from .models import Trip, DailyLog, LogEntry, Route
-from .serializers import TripSerializer, DailyLogSerializer, RouteSerializer
-from .utils import generate_hos_schedule, geocode_address, calculate_route
+from .models import Trip, DailyLog, LogEntry
+from .serializers import TripSerializer, TripListSerializer, DailyLogSerializer, LogEntrySerializer, RouteSerializer
+from .tasks import calculate_route_task
+
+
+def _trip_versions(request, pk):
+    """
+    Return (trip.updated_at, latest daily_log.updated_at, daily_log count) for
+    conditional GETs. The count catches deleted logs, which leave no newer
+    timestamp behind. Cached on the request since condition() asks for both
+    the ETag and Last-Modified.
+    """
+    if not hasattr(request, '_trip_versions'):
+        request._trip_versions = (
+            Trip.objects.filter(pk=pk)
+            .annotate(logs_updated_at=Max('daily_logs__updated_at'), logs_count=Count('daily_logs'))
+            .values_list('updated_at', 'logs_updated_at', 'logs_count')
+            .first()
+        )
+    return request._trip_versions
+
+
+def _trip_etag(request, pk=None, **kwargs):
+    versions = _trip_versions(request, pk)
+    if versions is None:
+        return None
+    # Include the negotiated media type so JSON and the browsable API differ
+    key = f"{versions[0]}|{versions[1]}|{versions[2]}|{getattr(request, 'accepted_media_type', '')}"
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def _trip_last_modified(request, pk=None, **kwargs):
+    versions = _trip_versions(request, pk)
+    if versions is None:
+        return None
+    return max(v for v in versions[:2] if v is not None)
+
+
+# Clients must revalidate (If-None-Match / If-Modified-Since) on every fetch,
+# so polling a pending trip never reuses a stale cached copy
+trip_conditional_get = [
+    cache_control(no_cache=True),
+    condition(etag_func=_trip_etag, last_modified_func=_trip_last_modified),
+]
 
 
 class TripViewSet(viewsets.ModelViewSet):
@@ -16,10 +64,35 @@ class TripViewSet(viewsets.ModelViewSet):
     serializer_class = TripSerializer
     permission_classes = [AllowAny]
     
+    def get_queryset(self):
+        """Load route, daily logs and their entries up front to avoid N+1 queries"""
+        queryset = Trip.objects.select_related('route').prefetch_related(
+            Prefetch(
+                'daily_logs',
+                queryset=DailyLog.objects.prefetch_related('entries').order_by('log_date')
+            )
+        )
+        if self.action == 'list':
+            # List responses don't include the polyline, so don't load it
+            queryset = queryset.defer('route__polyline')
+        return queryset
+    
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return TripListSerializer
+        return TripSerializer
+    
+    @method_decorator(trip_conditional_get)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+    
     @action(detail=False, methods=['post'])
     def calculate_route(self, request):
         """
-        Calculate route and generate HOS schedule
+        Create a pending trip and queue its route and HOS schedule
+        Returns 202 while a worker plans the trip; poll status_url until the
+        trip's status is COMPLETE or FAILED. Without a broker the trip is
+        planned inline and the response is 201 with its final status.
         
         Request body:
         {
@@ -30,9 +103,7 @@ class TripViewSet(viewsets.ModelViewSet):
         }
         """
         try:
-            maps_api_key = os.getenv('OPENROUTE_API_KEY')
-            
-            if not maps_api_key:
+            if not os.getenv('OPENROUTE_API_KEY'):
                 return Response(
                     {"error": "Maps API key not configured"},
                     status=status.HTTP_400_BAD_REQUEST
@@ -49,75 +120,25 @@ class TripViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            # Geocode locations
-            current_coords = geocode_address(current_location, maps_api_key)
-            pickup_coords = geocode_address(pickup_location, maps_api_key)
-            dropoff_coords = geocode_address(dropoff_location, maps_api_key)
-            
-            if not all([current_coords, pickup_coords, dropoff_coords]):
-                return Response(
-                    {"error": "Could not geocode one or more addresses"},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Calculate route: current -> pickup -> dropoff
-            route_data = calculate_route(
-                current_coords,
-                dropoff_coords,
-                via_pickup=pickup_coords,
-                maps_api_key=maps_api_key
-            )
-            
-            if not route_data:
-                return Response(
-                    {"error": "Could not calculate route"},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Generate HOS schedule
-            hos_schedule = generate_hos_schedule(
-                route_data['distance'],
-                current_cycle_used,
-                has_pickup=True
-            )
-            
-            # Create Trip
-            trip = Trip.objects.create(
+            trip = _create_pending_trip(
                 current_location=current_location,
                 pickup_location=pickup_location,
                 dropoff_location=dropoff_location,
-                current_cycle_used=current_cycle_used,
-                total_distance=route_data['distance'],
-                estimated_duration=route_data['duration']
+                current_cycle_used=current_cycle_used
             )
             
-            # Create Route
-            Route.objects.create(
-                trip=trip,
-                polyline=str(route_data.get('polyline', '')),
-                waypoints=[current_coords, pickup_coords, dropoff_coords],
-                stops=route_data.get('stops', [])
-            )
+            # Without a broker the task has already run inline, so report its outcome
+            trip.refresh_from_db(fields=['status', 'status_detail'])
             
-            # Create Daily Logs
-            start_date = datetime.now()
-            for day_idx, day_schedule in enumerate(hos_schedule['daily_schedules']):
-                log_date = start_date + timedelta(days=day_idx)
-                
-                daily_log = DailyLog.objects.create(
-                    trip=trip,
-                    log_date=log_date.date(),
-                    off_duty_hours=day_schedule['off_duty_hours'],
-                    sleeper_berth_hours=day_schedule['sleeper_berth_hours'],
-                    driving_hours=day_schedule['driving_hours'],
-                    on_duty_hours=day_schedule['on_duty_hours'],
-                    total_distance=sum(seg['distance'] for seg in day_schedule['driving_segments']),
-                    total_vehicle_miles=sum(seg['distance'] for seg in day_schedule['driving_segments']),
-                    remarks=f"Day {day_idx + 1} of {hos_schedule['total_days']}"
-                )
-            
-            serializer = TripSerializer(trip)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+            return Response(
+                {
+                    "trip_id": trip.id,
+                    "status": trip.status,
+                    "status_detail": trip.status_detail,
+                    "status_url": request.build_absolute_uri(reverse('trip-detail', args=[trip.id]))
+                },
+                status=status.HTTP_202_ACCEPTED if trip.status == Trip.STATUS_PENDING else status.HTTP_201_CREATED
+            )
             
         except Exception as e:
             return Response(
@@ -134,6 +155,7 @@ class TripViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
     
     @action(detail=True, methods=['get'])
+    @method_decorator(trip_conditional_get)
     def route_info(self, request, pk=None):
         """Get route information for a trip"""
         trip = self.get_object()
@@ -146,26 +168,69 @@ class TripViewSet(viewsets.ModelViewSet):
         )
 
 
+def _create_pending_trip(**trip_fields):
+    """Insert a PENDING trip and queue planning once the row is committed"""
+    with transaction.atomic():
+        trip = Trip.objects.create(status=Trip.STATUS_PENDING, **trip_fields)
+        transaction.on_commit(lambda: _queue_planning(trip.id))
+    return trip
+
+
+def _queue_planning(trip_id):
+    """Queue calculate_route_task, failing the trip if the broker can't take it"""
+    try:
+        calculate_route_task.delay(trip_id)
+    except Exception as e:
+        # Nothing would ever pick the trip up, so don't leave it PENDING
+        Trip.objects.filter(pk=trip_id, status=Trip.STATUS_PENDING).update(
+            status=Trip.STATUS_FAILED,
+            status_detail=f"Could not queue route planning: {e}",
+            updated_at=timezone.now()
+        )
+
+
 class DailyLogViewSet(viewsets.ModelViewSet):
     queryset = DailyLog.objects.all()
     serializer_class = DailyLogSerializer
     permission_classes = [AllowAny]
     
+    def get_queryset(self):
+        """Load entries and parent trip up front to avoid N+1 queries"""
+        return DailyLog.objects.select_related('trip').prefetch_related('entries')
+    
+    def perform_destroy(self, instance):
+        # Touch the trip so Last-Modified moves forward after a log is removed
+        with transaction.atomic():
+            trip_id = instance.trip_id
+            instance.delete()
+            Trip.objects.filter(pk=trip_id).update(updated_at=timezone.now())
+    
     @action(detail=True, methods=['post'])
     def update_entries(self, request, pk=None):
         """Update log entries for a daily log"""
         daily_log = self.get_object()
-        entries_data = request.data.get('entries', [])
         
-        # Clear existing entries
-        daily_log.entries.all().delete()
+        # Unknown keys are dropped; bad statuses or times are a 400
+        entry_serializer = LogEntrySerializer(data=request.data.get('entries', []), many=True)
+        entry_serializer.is_valid(raise_exception=True)
+        entries_data = entry_serializer.validated_data
         
-        # Create new entries
-        for entry_data in entries_data:
-            LogEntry.objects.create(
-                daily_log=daily_log,
-                **entry_data
-            )
+        with transaction.atomic():
+            # Clear existing entries
+            LogEntry.objects.filter(daily_log_id=daily_log.pk).delete()
+            
+            if settings.LOG_TIMELINE_RLE:
+                daily_log.set_timeline(entries_data)
+                daily_log.save(update_fields=['entries_rle', 'updated_at'])
+            else:
+                DailyLog.objects.filter(pk=daily_log.pk).update(entries_rle=[], updated_at=timezone.now())
+                
+                LogEntry.objects.bulk_create(
+                    [LogEntry(daily_log=daily_log, **entry_data) for entry_data in entries_data],
+                    batch_size=200
+                )
         
+        # Re-fetch so the serializer doesn't read the stale prefetched entries
+        daily_log = self.get_queryset().get(pk=daily_log.pk)
         serializer = DailyLogSerializer(daily_log)
         return Response(serializer.data)